@@ -3,7 +3,6 @@
 
 import os
 import sys
-import codecs
 import re
 
 CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff]')
@@ -11,12 +10,13 @@ CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff]')
 def contains_chinese(text: str) -> bool:
     return bool(CHINESE_PATTERN.search(text))
 
-def check_chn_files_for_chinese(directory='.'):
+def check_chn_files_for_chinese(directory='.', tree=None):
     """
     检查指定目录下每个子文件夹中的所有.chn文件是否包含中文字符
     
     Args:
         directory: 要检查的目录，默认为当前目录
+        tree: 已扫描好的CnTree，链式调用时复用；为None时自行扫描directory
         
     Returns:
         dict: 包含检查结果的字典
@@ -33,12 +33,12 @@ def check_chn_files_for_chinese(directory='.'):
         results['errors'].append(f"路径 '{directory}' 不存在")
         return results
     
+    if tree is None:
+        from cn_tree import CnTree
+        tree = CnTree.scan(directory)
+    
     # 获取所有子文件夹
-    subfolders = []
-    for item in os.listdir(directory):
-        item_path = os.path.join(directory, item)
-        if os.path.isdir(item_path):
-            subfolders.append(item_path)
+    subfolders = tree.mods
     
     if not subfolders:
         print("未找到任何子文件夹")
@@ -46,17 +46,12 @@ def check_chn_files_for_chinese(directory='.'):
     
     print(f"开始检查 {len(subfolders)} 个子文件夹...\n")
     
-    for subfolder in sorted(subfolders):
-        subfolder_name = os.path.basename(subfolder)
+    for subfolder_name in subfolders:
         print(f"检查子文件夹: {subfolder_name}")
         print("-" * 50)
         
         # 统计当前子文件夹中的.chn文件
-        chn_files = []
-        for root, dirs, files in os.walk(subfolder):
-            for file in files:
-                if file.lower().endswith('.chn'):
-                    chn_files.append(os.path.join(root, file))
+        chn_files = tree.with_suffix('.chn', subfolder_name)
         
         if not chn_files:
             print(f"子文件夹 {subfolder_name} 中没有.chn文件")
@@ -67,11 +62,11 @@ def check_chn_files_for_chinese(directory='.'):
         has_chinese_in_subfolder = False
         has_errors_in_subfolder = False
         
-        for i, file_path in enumerate(chn_files, 1):
+        for i, rel in enumerate(chn_files, 1):
+            file_path = tree.path(rel)
             try:
                 # 使用UTF-16 LE编码读取文件
-                with codecs.open(file_path, 'r', encoding='utf-16-le') as f:
-                    content = f.read()
+                content = tree.read_text(rel, 'utf-16-le')
                 
                 # 检查是否包含中文
                 if contains_chinese(content):
@@ -85,8 +80,7 @@ def check_chn_files_for_chinese(directory='.'):
             except UnicodeDecodeError:
                 # 如果UTF-16 LE解码失败，尝试其他编码
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    content = tree.read_text(rel, 'utf-8')
                     
                     if contains_chinese(content):
                         results['has_chinese'].append(file_path)
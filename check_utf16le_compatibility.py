@@ -3,14 +3,14 @@
 
 import os
 import sys
-import codecs
 
-def check_utf16le_compatibility(directory='cn'):
+def check_utf16le_compatibility(directory='cn', tree=None):
     """
     检查指定目录及其子目录中的所有文件是否可以用UTF-16 LE编码读取
     
     Args:
         directory: 要检查的目录，默认为当前目录
+        tree: 已扫描好的CnTree，链式调用时复用；为None时自行扫描directory
         
     Returns:
         dict: 包含检查结果的字典
@@ -18,7 +18,8 @@ def check_utf16le_compatibility(directory='cn'):
     results = {
         'utf16le_ok': [],      # 可以用UTF-16 LE正确读取的文件
         'utf16le_failed': [],  # 不能用UTF-16 LE读取的文件
-        'other_errors': []     # 其他读取错误
+        'other_errors': [],    # 其他读取错误
+        'actual_encoding': {}  # 不兼容文件 -> 检测到的实际编码
     }
     
     if not os.path.exists(directory):
@@ -26,11 +27,12 @@ def check_utf16le_compatibility(directory='cn'):
         results['other_errors'].append(f"路径 '{directory}' 不存在")
         return results
     
+    if tree is None:
+        from cn_tree import CnTree
+        tree = CnTree.scan(directory)
+    
     # 获取所有文件
-    all_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            all_files.append(os.path.join(root, file))
+    all_files = tree.files
     
     total_files = len(all_files)
     print(f"开始检查 {total_files} 个文件的UTF-16 LE兼容性...\n")
@@ -39,11 +41,11 @@ def check_utf16le_compatibility(directory='cn'):
         print("未找到任何文件")
         return results
     
-    for i, file_path in enumerate(all_files, 1):
+    for i, rel in enumerate(all_files, 1):
+        file_path = tree.path(rel)
         try:
             # 尝试用UTF-16 LE读取文件
-            with codecs.open(file_path, 'r', encoding='utf-16-le') as f:
-                content = f.read()
+            tree.read_text(rel, 'utf-16-le')
             
             # 如果能读取到内容，说明文件是UTF-16 LE编码
             results['utf16le_ok'].append(file_path)
@@ -52,6 +54,7 @@ def check_utf16le_compatibility(directory='cn'):
         except UnicodeDecodeError:
             # UTF-16 LE解码失败
             results['utf16le_failed'].append(file_path)
+            results['actual_encoding'][file_path] = detect_actual_encoding(file_path, tree.read_bytes(rel))
             print(f"❌ [{i}/{total_files}] {file_path} - 不兼容UTF-16 LE")
             
         except Exception as e:
@@ -62,22 +65,29 @@ def check_utf16le_compatibility(directory='cn'):
     
     return results
 
-def detect_actual_encoding(file_path):
+def detect_actual_encoding(file_path, raw=None):
     """
     尝试检测文件的真实编码
     
     Args:
         file_path: 文件路径
+        raw: 文件内容，已读入（例如来自归档）时传入，避免再次打开file_path
         
     Returns:
         str: 检测到的编码，如果无法检测返回None
     """
     encodings_to_try = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'ascii']
     
+    if raw is None:
+        try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except OSError:
+            return None
+    
     for encoding in encodings_to_try:
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                f.read()
+            raw.decode(encoding)
             return encoding
         except:
             continue
@@ -103,7 +113,7 @@ def print_detailed_results(results):
     if results['utf16le_failed']:
         for file_path in sorted(results['utf16le_failed']):
             # 尝试检测实际编码
-            actual_encoding = detect_actual_encoding(file_path)
+            actual_encoding = results.get('actual_encoding', {}).get(file_path) or detect_actual_encoding(file_path)
             if actual_encoding:
                 print(f"  - {file_path} (实际编码: {actual_encoding})")
             else:
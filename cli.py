@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统一命令行入口
+
+用法示例:
+    python cli.py validate detect merge
+    python cli.py --workshop "D:\\Steam\\steamapps\\workshop\\content\\268500" deploy
+    python cli.py --timing layout validate chinese
+    python cli.py pack
+    python cli.py --use-archive validate deploy
+
+多个子命令按顺序执行，并共享同一次对 cn 目录的扫描结果；
+指定 --use-archive 时改为直接从 .cnpk 归档中随机读取成员。
+各子命令依赖的模块（尤其是 charset_normalizer）只在执行到该命令时才导入，
+--timing 会把启动耗时和每个子命令的耗时输出到 stderr；
+更细的导入耗时可以用 python -X importtime cli.py ... 查看。
+"""
+
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import os
+import sys
+
+
+class Context:
+    """在链式子命令之间共享的状态"""
+
+    def __init__(self, args):
+        self.args = args
+        self._tree = None
+
+    @property
+    def tree(self):
+        # 第一次用到时才扫描 cn 目录，之后的子命令直接复用
+        if self._tree is None:
+            if self.args.use_archive:
+                from cn_pack import CnPack
+                self._tree = CnPack(self.args.archive)
+            else:
+                from cn_tree import CnTree
+                self._tree = CnTree.scan(self.args.cn)
+        return self._tree
+
+    def invalidate(self):
+        """子命令改动了 cn 目录结构后调用，下一个子命令会重新扫描"""
+        self.close()
+        self._tree = None
+
+    def close(self):
+        if self._tree is not None and hasattr(self._tree, 'close'):
+            self._tree.close()
+
+
+def cmd_layout(ctx):
+    from check_localization_folders import check_and_fix_cn_subfolders, print_summary
+    print_summary(check_and_fix_cn_subfolders(ctx.args.cn))
+    ctx.invalidate()
+
+
+def cmd_validate(ctx):
+    from check_utf16le_compatibility import check_utf16le_compatibility, print_detailed_results
+    print_detailed_results(check_utf16le_compatibility(ctx.tree.root, tree=ctx.tree))
+
+
+def cmd_chinese(ctx):
+    from check_chinese_in_chn import check_chn_files_for_chinese, print_results
+    print_results(check_chn_files_for_chinese(ctx.tree.root, tree=ctx.tree))
+
+
+def cmd_detect(ctx):
+    from det import detect_and_convert
+    detect_and_convert(ctx.args.cn, tree=ctx.tree)
+
+
+def cmd_merge(ctx):
+    from combine import build_mapping, write_mapping
+    write_mapping(build_mapping(ctx.args.chn_dir, ctx.args.int_dir), ctx.args.out_dir)
+
+
+def cmd_pack(ctx):
+    from cn_pack import CnPackError, pack, print_pack_summary
+    try:
+        results = pack(ctx.args.cn, ctx.args.archive, tree=ctx.tree)
+    except CnPackError as e:
+        print(f"错误: 打包失败: {e}")
+        return 1
+    print_pack_summary(results, ctx.args.archive)
+
+
+def cmd_unpack(ctx):
+    from cn_pack import unpack
+    print(f"已解出 {unpack(ctx.args.archive, ctx.args.cn)} 个文件到 {ctx.args.cn}")
+    ctx.invalidate()
+
+
+def cmd_draft(ctx):
+    from mt_draft import draft_translations, print_draft_summary
+    if not os.path.isdir(ctx.args.int_dir):
+        print(f"错误: 路径 '{ctx.args.int_dir}' 不存在")
+        return 1
+    results = draft_translations(
+        ctx.args.chn_dir, ctx.args.int_dir, ctx.args.out_dir, url=ctx.args.mt_url,
+        cache_path=ctx.args.mt_cache, concurrency=ctx.args.mt_concurrency,
+    )
+    print_draft_summary(results)
+    # 有批次失败时以非 0 退出，并停止后续的链式子命令
+    if results['aborted'] or results['failed']:
+        return 1
+
+
+def cmd_convert(ctx):
+    from change import convert_encoding_and_rename
+    for folder in (ctx.args.chn_dir, ctx.args.int_dir):
+        if os.path.isdir(folder):
+            convert_encoding_and_rename(folder)
+
+
+def cmd_copyloc(ctx):
+    from copyloc import copy_localization
+    if ctx.args.mod:
+        return copy_localization(ctx.args.mod)
+    return copy_localization()
+
+
+def cmd_find(ctx):
+    from findCHN import find_chn_folders
+    if ctx.args.workshop:
+        find_chn_folders(ctx.args.workshop)
+    else:
+        find_chn_folders()
+
+
+def cmd_deploy(ctx):
+    from main import deploy
+    if ctx.args.workshop:
+        results = deploy(ctx.args.workshop, tree=ctx.tree)
+    else:
+        results = deploy(tree=ctx.tree)
+    if results['skipped']:
+        print(f"⚠️  {len(results['skipped'])} 个文件因归档损坏未部署")
+        return 1
+
+
+COMMANDS = {
+    'layout': (cmd_layout, '修复 cn 下每个 mod 只包含 Localization 文件夹'),
+    'validate': (cmd_validate, '检查 cn 下所有文件能否按 UTF-16 LE 读取'),
+    'chinese': (cmd_chinese, '检查 .chn 文件是否包含中文'),
+    'detect': (cmd_detect, '检测 .chn 编码并把 utf-8/gb18030 转为 UTF-16LE'),
+    'pack': (cmd_pack, '把 cn 打包为带索引的压缩归档，复用未变化的成员'),
+    'unpack': (cmd_unpack, '把归档完整解出到 cn'),
+    'merge': (cmd_merge, '由 CHN/INT 生成 en->cn 映射'),
+    'draft': (cmd_draft, '把 INT 中未翻译的文本分批发送到翻译接口，生成草稿'),
+    'convert': (cmd_convert, '把 CHN/INT 下的文件从 UTF-16LE 转为 utf-8 .txt'),
+    'copyloc': (cmd_copyloc, '从单个 mod 的 Localization 复制 .int/.chn 到 INT/CHN'),
+    'find': (cmd_find, '列出创意工坊中带 Localization\\CHN 的 mod'),
+    'deploy': (cmd_deploy, '把 cn 中缺失的 .chn 部署到创意工坊 mod 目录'),
+}
+
+# 这些子命令会读写 cn 目录本身，不能在 --use-archive 模式下运行
+WRITES_CN = {'layout', 'detect', 'pack', 'unpack'}
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"必须大于等于 1: {value}")
+    return number
+
+
+def build_parser():
+    epilog = '子命令:\n' + '\n'.join(f'  {name:<10}{desc}' for name, (_, desc) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description='XCOM2 mod 汉化工具集',
+        epilog=epilog,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('commands', nargs='+', metavar='COMMAND',
+                        help='按顺序执行的子命令，可以链式指定多个')
+    parser.add_argument('--cn', default='cn', help='汉化包目录，默认为 cn')
+    parser.add_argument('--archive', default='cn.cnpk', help='pack/unpack 使用的归档文件，默认为 cn.cnpk')
+    parser.add_argument('--use-archive', action='store_true',
+                        help='validate/chinese/deploy 直接从归档读取，而不是扫描 cn 目录')
+    parser.add_argument('--workshop', help='创意工坊 268500 目录，默认使用脚本内置路径')
+    parser.add_argument('--mod', help='copyloc 使用的单个 mod 目录，默认使用脚本内置路径')
+    parser.add_argument('--chn-dir', default='CHN', help='merge/draft/convert 使用的 CHN 目录')
+    parser.add_argument('--int-dir', default='INT', help='merge/draft/convert 使用的 INT 目录')
+    parser.add_argument('--out-dir', default='MERGED',
+                        help='merge 写出 mapping.txt 的目录；draft 从这里读取 mapping*.txt，'
+                             '并写出 mt_cache.json 和 drafts.txt')
+    parser.add_argument('--mt-url', default='http://127.0.0.1:8089/translate', help='draft 使用的翻译接口')
+    parser.add_argument('--mt-cache', help='draft 的结果缓存文件，默认为 <out-dir>/mt_cache.json')
+    parser.add_argument('--mt-concurrency', type=positive_int, default=4, help='draft 同时在途的请求数')
+    parser.add_argument('--timing', action='store_true', help='输出启动和各子命令耗时到 stderr')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.commands if name not in COMMANDS]
+    if unknown:
+        parser.error(f"未知子命令: {', '.join(unknown)}")
+    if args.use_archive:
+        writes_cn = [name for name in args.commands if name in WRITES_CN]
+        if writes_cn:
+            parser.error(f"--use-archive 不能与会修改 cn 目录的子命令一起使用: {', '.join(writes_cn)}")
+        if not os.path.isfile(args.archive):
+            parser.error(f"归档 '{args.archive}' 不存在")
+
+    if args.timing:
+        print(f"[timing] 启动: {(time.perf_counter() - _START) * 1000:.1f} ms", file=sys.stderr)
+
+    ctx = Context(args)
+    try:
+        for name in args.commands:
+            started = time.perf_counter()
+            code = COMMANDS[name][0](ctx)
+            if args.timing:
+                print(f"[timing] {name}: {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+            if code:
+                return code
+    finally:
+        ctx.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cn 翻译包归档（.cnpk）
+
+把整个 cn 目录写成单个文件，便于复制、同步和校验：
+
+    MAGIC | 成员1(zlib) | 成员2(zlib) | ... | 索引(zlib 压缩的 JSON) | 尾部
+
+尾部固定 16 字节：索引偏移(8) + 索引长度(4) + MAGIC_END(4)。
+索引记录每个文件的 mod id、相对路径、sha1、原始大小、编码以及压缩数据的位置和 crc32，
+读取时只需读尾部和索引，之后按偏移随机读取单个成员，无需整体解压。
+重新打包时，sha1 未变化且压缩数据 crc32 校验通过的成员直接复用旧归档中的压缩数据。
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+
+from cn_tree import CnTree, mod_id_of
+
+MAGIC = b'CNPK\x00\x01\x00\x00'
+MAGIC_END = b'CNPK'
+FOOTER = struct.Struct('<QI4s')
+INDEX_VERSION = 2
+
+
+class CnPackError(Exception):
+    pass
+
+
+def check_member_path(rel):
+    """索引中的路径必须是 root 下的相对路径，不能是绝对路径或包含 '..'"""
+    if (
+        not isinstance(rel, str)
+        or '\\' in rel
+        or ':' in rel.split('/')[0]
+        or any(part in ('', '.', '..') for part in rel.split('/'))
+    ):
+        raise CnPackError(f"索引中的路径不安全: {rel!r}")
+    return rel
+
+
+def guess_encoding(raw):
+    """根据 BOM 和简单规则猜测编码，不依赖 charset_normalizer"""
+    if raw.startswith(b'\xff\xfe'):
+        return 'utf-16-le-bom'
+    if raw.startswith(b'\xfe\xff'):
+        return 'utf-16-be-bom'
+    if raw.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-bom'
+    even = len(raw) >= 2 and len(raw) % 2 == 0
+    # 没有 BOM 且含 ASCII 的 UTF-16 LE：文本文件的 UTF-8 / GB18030 中不会出现 0 字节
+    if even and b'\x00' in raw:
+        try:
+            raw.decode('utf-16-le')
+            return 'utf-16-le'
+        except UnicodeDecodeError:
+            pass
+    try:
+        raw.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    # 没有 BOM、以中文为主的 UTF-16 LE；偶数长度的任意字节几乎都能按 UTF-16 LE 解码，
+    # 所以还要求解出的字符基本都是常见字符
+    if even:
+        try:
+            if _plausible(raw.decode('utf-16-le')):
+                return 'utf-16-le'
+        except UnicodeDecodeError:
+            pass
+    try:
+        raw.decode('gb18030')
+        return 'gb18030'
+    except UnicodeDecodeError:
+        return 'unknown'
+
+
+def _plausible(text):
+    """ASCII、CJK 统一汉字、CJK 标点和全角字符占 90% 以上"""
+    common = sum(
+        1 for ch in text
+        if ch < '\x7f' or '\u4e00' <= ch <= '\u9fff' or '\u3000' <= ch <= '\u303f' or '\uff00' <= ch <= '\uffef'
+    )
+    return common * 10 >= len(text) * 9
+
+
+class CnPack(CnTree):
+    """
+    以只读方式打开 .cnpk 归档
+
+    接口与 CnTree 一致，校验、部署等命令可以直接从归档读取成员。
+    """
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        self._fp = open(archive_path, 'rb')
+        try:
+            index = read_index(self._fp)
+            # deploy/unpack 会把这些路径直接用作目标文件名
+            for mod_id in index['mods']:
+                if '/' in check_member_path(mod_id):
+                    raise CnPackError(f"索引中的 mod id 不安全: {mod_id!r}")
+            for entry in index['files']:
+                check_member_path(entry['path'])
+        except BaseException:
+            self._fp.close()
+            raise
+        self.entries = {entry['path']: entry for entry in index['files']}
+        super().__init__(archive_path, index['mods'], sorted(self.entries))
+
+    def close(self):
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read_compressed(self, rel):
+        entry = self.entries[rel]
+        self._fp.seek(entry['offset'])
+        return self._fp.read(entry['csize'])
+
+    def read_bytes(self, rel):
+        entry = self.entries[rel]
+        data = self.read_compressed(rel)
+        if len(data) != entry['csize'] or zlib.crc32(data) != entry['crc32']:
+            raise CnPackError(f"{self.path(rel)}: crc32 校验失败")
+        try:
+            raw = zlib.decompress(data)
+        except zlib.error as e:
+            raise CnPackError(f"{self.path(rel)}: 解压失败: {e}") from e
+        if len(raw) != entry['size'] or hashlib.sha1(raw).hexdigest() != entry['sha1']:
+            raise CnPackError(f"{self.path(rel)}: sha1 校验失败")
+        return raw
+
+    def copy_to(self, rel, dst):
+        # 先完整读出并校验，再写临时文件替换，失败时不会在目标位置留下空文件
+        raw = self.read_bytes(rel)
+        tmp_path = dst + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_path, dst)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def read_index(fp):
+    try:
+        index = _read_index(fp)
+        index['mods'], index['files']
+    except CnPackError:
+        raise
+    except (struct.error, zlib.error, ValueError, KeyError, TypeError) as e:
+        # ValueError 包括 JSON 和 UTF-8 解码错误
+        raise CnPackError(f"索引损坏: {e}") from e
+    return index
+
+
+def _read_index(fp):
+    fp.seek(0)
+    if fp.read(len(MAGIC)) != MAGIC:
+        raise CnPackError("不是 cnpk 归档")
+    fp.seek(-FOOTER.size, os.SEEK_END)
+    index_offset, index_length, magic_end = FOOTER.unpack(fp.read(FOOTER.size))
+    if magic_end != MAGIC_END:
+        raise CnPackError("归档尾部损坏")
+    fp.seek(index_offset)
+    index = json.loads(zlib.decompress(fp.read(index_length)).decode('utf-8'))
+    if index.get('version') != INDEX_VERSION:
+        raise CnPackError(f"不支持的索引版本: {index.get('version')}")
+    return index
+
+
+def pack(root='cn', archive_path='cn.cnpk', tree=None, level=9):
+    """
+    把 root 打包为 archive_path；若 archive_path 已存在，复用其中未变化的成员
+
+    Returns:
+        dict: {'reused': [...], 'compressed': [...], 'removed': [...]}
+    """
+    if tree is None:
+        tree = CnTree.scan(root)
+    # 源目录不存在或为空时不能覆盖已有归档
+    if not os.path.isdir(tree.root):
+        raise CnPackError(f"路径 '{tree.root}' 不存在或不是目录")
+    if not tree.files:
+        raise CnPackError(f"路径 '{tree.root}' 中没有任何文件，不生成空归档")
+
+    old = None
+    if os.path.exists(archive_path):
+        try:
+            old = CnPack(archive_path)
+        except (CnPackError, OSError, ValueError) as e:
+            print(f"⚠️  旧归档不可用，将完整重新打包: {e}")
+
+    results = {'reused': [], 'compressed': [], 'removed': []}
+    entries = []
+    tmp_path = archive_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(MAGIC)
+            for rel in tree.files:
+                raw = tree.read_bytes(rel)
+                sha1 = hashlib.sha1(raw).hexdigest()
+                old_entry = old.entries.get(rel) if old else None
+                data = None
+                if old_entry and old_entry['sha1'] == sha1:
+                    data = old.read_compressed(rel)
+                    # 旧归档中损坏的成员不能复用，否则会被带进之后的每一个归档
+                    if zlib.crc32(data) == old_entry['crc32']:
+                        results['reused'].append(rel)
+                    else:
+                        data = None
+                if data is None:
+                    data = zlib.compress(raw, level)
+                    results['compressed'].append(rel)
+                entries.append({
+                    'mod': mod_id_of(rel),
+                    'path': rel,
+                    'sha1': sha1,
+                    'size': len(raw),
+                    'encoding': guess_encoding(raw),
+                    'offset': out.tell(),
+                    'csize': len(data),
+                    'crc32': zlib.crc32(data),
+                })
+                out.write(data)
+
+            index = {'version': INDEX_VERSION, 'mods': tree.mods, 'files': entries}
+            index_data = zlib.compress(json.dumps(index, ensure_ascii=False).encode('utf-8'), level)
+            index_offset = out.tell()
+            out.write(index_data)
+            out.write(FOOTER.pack(index_offset, len(index_data), MAGIC_END))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if old:
+            results['removed'] = sorted(set(old.entries) - set(tree.files))
+            old.close()
+
+    os.replace(tmp_path, archive_path)
+    return results
+
+
+def unpack(archive_path='cn.cnpk', root='cn'):
+    """把归档完整解出到 root（部署和校验不需要这一步）"""
+    real_root = os.path.realpath(root)
+    with CnPack(archive_path) as archive:
+        for mod_id in archive.mods:
+            os.makedirs(os.path.join(root, mod_id), exist_ok=True)
+        for rel in archive.files:
+            dst = os.path.join(root, *rel.split('/'))
+            # CnPack 已检查过路径，这里再确认一次最终位置仍在 root 之内（例如符号链接）
+            if os.path.commonpath([real_root, os.path.realpath(dst)]) != real_root:
+                raise CnPackError(f"成员 {rel!r} 会被解出到 {root} 之外")
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            archive.copy_to(rel, dst)
+        return len(archive.files)
+
+
+def print_pack_summary(results, archive_path):
+    total = len(results['reused']) + len(results['compressed'])
+    print(f"📦 已写入 {archive_path}: {total} 个文件, {os.path.getsize(archive_path)} 字节")
+    print(f"  复用未变化成员: {len(results['reused'])} 个")
+    print(f"  重新压缩: {len(results['compressed'])} 个")
+    print(f"  已移除: {len(results['removed'])} 个")
+
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else 'cn'
+    archive_path = sys.argv[2] if len(sys.argv) > 2 else 'cn.cnpk'
+    print_pack_summary(pack(root, archive_path), archive_path)
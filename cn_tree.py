@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import codecs
+import io
+import os
+import shutil
+
+
+class CnTree:
+    """
+    cn 翻译包目录的一次扫描结果
+
+    链式执行多个子命令时共享同一个实例，避免每个命令各自重新遍历整个目录树。
+    文件路径统一保存为相对于 root、以 '/' 分隔的形式，第一段即 mod id。
+    """
+
+    def __init__(self, root, mods, files):
+        self.root = root
+        self.mods = mods      # root 下的直接子目录（mod id），已排序
+        self.files = files    # 所有文件的相对路径，已排序
+        self._by_mod = {}
+        for rel in files:
+            self._by_mod.setdefault(mod_id_of(rel), []).append(rel)
+
+    @classmethod
+    def scan(cls, root='cn'):
+        """遍历一次 root，收集所有子文件夹和文件"""
+        mods = []
+        files = []
+        if not os.path.isdir(root):
+            return cls(root, mods, files)
+
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root)
+            if rel_dir == '.':
+                mods.extend(dirnames)
+                prefix = ''
+            else:
+                prefix = rel_dir.replace(os.sep, '/') + '/'
+            for name in filenames:
+                files.append(prefix + name)
+
+        mods.sort()
+        files.sort()
+        return cls(root, mods, files)
+
+    def mod_files(self, mod_id):
+        """返回某个 mod 下的所有文件（相对路径）"""
+        return self._by_mod.get(mod_id, [])
+
+    def with_suffix(self, suffix, mod_id=None):
+        """按后缀（不区分大小写）筛选文件"""
+        files = self.files if mod_id is None else self.mod_files(mod_id)
+        suffix = suffix.lower()
+        return [rel for rel in files if rel.lower().endswith(suffix)]
+
+    def path(self, rel):
+        """相对路径 -> 磁盘路径"""
+        return os.path.join(self.root, *rel.split('/'))
+
+    def read_bytes(self, rel):
+        with open(self.path(rel), 'rb') as f:
+            return f.read()
+
+    def read_text(self, rel, encoding):
+        """与 codecs.open(path, 'r', encoding).read() 行为一致（末尾不完整的字节会被忽略）"""
+        return codecs.getreader(encoding)(io.BytesIO(self.read_bytes(rel))).read()
+
+    def copy_to(self, rel, dst):
+        shutil.copy2(self.path(rel), dst)
+
+
+def mod_id_of(rel):
+    """相对路径的第一段即 mod id；直接位于 root 下的文件返回空字符串"""
+    head, sep, _ = rel.partition('/')
+    return head if sep else ''
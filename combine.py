@@ -5,8 +5,6 @@ chn_dir = "CHN"
 int_dir = "INT"
 out_dir = "MERGED"
 
-os.makedirs(out_dir, exist_ok=True)
-
 section_pattern = re.compile(r'^\[.*\]$')
 kv_pattern = re.compile(r'^(.+?)\s*=\s*"(.*)"$')
 chinese_pattern = re.compile(r'[\u4e00-\u9fff]')  # 用于检测中文字符
@@ -33,34 +31,43 @@ def parse_file(path):
                     data[current_section][key] = val
     return data
 
-chn_files = {f for f in os.listdir(chn_dir) if f.lower().endswith(".chn")}
-int_files = {f for f in os.listdir(int_dir) if f.lower().endswith(".int")}
-common_basenames = {os.path.splitext(f)[0] for f in chn_files} & {os.path.splitext(f)[0] for f in int_files}
+def common_basenames(chn_dir=chn_dir, int_dir=int_dir):
+    chn_files = {f for f in os.listdir(chn_dir) if f.lower().endswith(".chn")}
+    int_files = {f for f in os.listdir(int_dir) if f.lower().endswith(".int")}
+    return {os.path.splitext(f)[0] for f in chn_files} & {os.path.splitext(f)[0] for f in int_files}
+
+def build_mapping(chn_dir=chn_dir, int_dir=int_dir):
+    # 用于收集所有 en->cn 映射，避免重复
+    mapping = {}
 
-# 用于收集所有 en->cn 映射，避免重复
-mapping = {}
+    for basename in common_basenames(chn_dir, int_dir):
+        file_cn = os.path.join(chn_dir, basename + ".chn")
+        file_en = os.path.join(int_dir, basename + ".int")
+        
+        cn_data = parse_file(file_cn)
+        en_data = parse_file(file_en)
+        
+        for section, en_kvs in en_data.items():
+            cn_kvs = cn_data.get(section, {})
+            for k, en_val in en_kvs.items():
+                cn_val = cn_kvs.get(k, "")
+                # 校验cn_val必须包含中文字符，且避免重复键值对
+                if en_val and cn_val and chinese_pattern.search(cn_val):
+                    if en_val not in mapping or mapping[en_val] != cn_val:
+                        mapping[en_val] = cn_val
+        
+        print(f"处理完成文件: {basename}")
+    return mapping
 
-for basename in common_basenames:
-    file_cn = os.path.join(chn_dir, basename + ".chn")
-    file_en = os.path.join(int_dir, basename + ".int")
-    
-    cn_data = parse_file(file_cn)
-    en_data = parse_file(file_en)
-    
-    for section, en_kvs in en_data.items():
-        cn_kvs = cn_data.get(section, {})
-        for k, en_val in en_kvs.items():
-            cn_val = cn_kvs.get(k, "")
-            # 校验cn_val必须包含中文字符，且避免重复键值对
-            if en_val and cn_val and chinese_pattern.search(cn_val):
-                if en_val not in mapping or mapping[en_val] != cn_val:
-                    mapping[en_val] = cn_val
-    
-    print(f"处理完成文件: {basename}")
+def write_mapping(mapping, out_dir=out_dir):
+    # 输出所有 en->cn 映射到 mapping.txt
+    os.makedirs(out_dir, exist_ok=True)
+    mapping_path = os.path.join(out_dir, "mapping.txt")
+    with open(mapping_path, "w", encoding="utf-8") as f:
+        for en_val, cn_val in sorted(mapping.items()):
+            f.write(f"{en_val} -> {cn_val}\n")
+    print(f"所有映射已保存到 {mapping_path}")
+    return mapping_path
 
-# 输出所有 en->cn 映射到 mapping.txt
-mapping_path = os.path.join(out_dir, "mapping.txt")
-with open(mapping_path, "w", encoding="utf-8") as f:
-    for en_val, cn_val in sorted(mapping.items()):
-        f.write(f"{en_val} -> {cn_val}\n")
-print(f"所有映射已保存到 {mapping_path}")
+if __name__ == "__main__":
+    write_mapping(build_mapping())
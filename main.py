@@ -1,24 +1,53 @@
 import os
-import shutil
 
 target_path = r"C:\Program Files (x86)\Steam\steamapps\workshop\content\268500"
-src_root = os.path.join(os.getcwd(), "cn")
-for mod_id in os.listdir(src_root):
-    src_mod_path = os.path.join(src_root, mod_id, "Localization")
-    tgt_mod_path = os.path.join(target_path, mod_id, "Localization")
-    if not os.path.isdir(src_mod_path) or not os.path.isdir(tgt_mod_path):
-        continue
-    for file in os.listdir(src_mod_path):
-        if file.endswith(".chn"):
-            src_file = os.path.join(src_mod_path, file)
-            tgt_file = os.path.join(tgt_mod_path, file)
+
+
+def find_mod_name(mod_dir):
+    for fname in os.listdir(mod_dir):
+        if fname.endswith(".XComMod"):
+            return fname.split(".")[0]
+    return None
+
+
+def deploy(target_path=target_path, src_root=None, tree=None):
+    """
+    把 cn/<mod_id>/Localization 下缺失的 .chn 文件复制到创意工坊对应 mod 目录
+
+    Returns:
+        dict: {'replaced': [已复制的目标文件], 'skipped': [(相对路径, 错误), ...]}
+    """
+    from cn_pack import CnPackError
+
+    if tree is None:
+        from cn_tree import CnTree
+        tree = CnTree.scan(src_root or os.path.join(os.getcwd(), "cn"))
+
+    results = {'replaced': [], 'skipped': []}
+    for mod_id in tree.mods:
+        tgt_mod_path = os.path.join(target_path, mod_id, "Localization")
+        if not os.path.isdir(tgt_mod_path):
+            continue
+        for rel in tree.mod_files(mod_id):
+            parts = rel.split("/")
+            # 只处理 Localization 目录下直接存放的 .chn 文件
+            if len(parts) != 3 or parts[1] != "Localization" or not parts[2].endswith(".chn"):
+                continue
+            tgt_file = os.path.join(tgt_mod_path, parts[2])
             if not os.path.exists(tgt_file):
-                shutil.copy2(src_file, tgt_file)
-                mod_name = None
-                mod_dir = os.path.join(target_path, mod_id)
-                for fname in os.listdir(mod_dir):
-                    if fname.endswith(".XComMod"):
-                        mod_name = fname.split(".")[0]
-                        break
+                try:
+                    tree.copy_to(rel, tgt_file)
+                except CnPackError as e:
+                    # 归档中损坏的成员跳过，不影响其他文件的部署
+                    print(f"⚠️  跳过损坏的文件: {e}")
+                    results['skipped'].append((rel, e))
+                    continue
+                results['replaced'].append(tgt_file)
+                mod_name = find_mod_name(os.path.join(target_path, mod_id))
                 if mod_name:
-                    print(f"已替换: {mod_name}")
\ No newline at end of file
+                    print(f"已替换: {mod_name}")
+    return results
+
+
+if __name__ == "__main__":
+    deploy()
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+机器翻译草稿
+
+从 INT/CHN 配对中收集 .int 里尚未翻译的文本，先用已有的 en->cn 映射和本地缓存去重，
+剩下的按大小分批，通过保持连接的 HTTP 连接池并发发送到翻译接口。
+
+翻译接口协议（POST JSON）:
+    请求: {"source": "en", "target": "zh", "texts": ["...", ...]}
+    响应: {"translations": ["...", ...]}
+响应使用 Content-Length 或 Transfer-Encoding: chunked 均可。
+
+本地测试可以先运行 python mt_stub_server.py 启动替身服务。
+"""
+
+import asyncio
+import glob
+import json
+import os
+import re
+import sys
+import urllib.parse
+
+from combine import chinese_pattern, parse_file
+
+DEFAULT_URL = "http://127.0.0.1:8089/translate"
+
+_whitespace = re.compile(r'\s+')
+
+
+class MtError(Exception):
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class ConnectError(MtError):
+    """无法建立到翻译接口的连接"""
+
+    def __init__(self, message):
+        super().__init__(message, retryable=True)
+
+
+def normalize(text):
+    """缓存和去重使用的规范化形式：合并空白并去掉首尾空白"""
+    return _whitespace.sub(' ', text).strip()
+
+
+def collect_untranslated(chn_dir="CHN", int_dir="INT"):
+    """
+    收集 .int 中在对应 .chn 里缺失或不含中文的值
+
+    Returns:
+        list: [(basename, section, key, en_val), ...]
+    """
+    entries = []
+    for name in sorted(os.listdir(int_dir)):
+        if not name.lower().endswith(".int"):
+            continue
+        basename = os.path.splitext(name)[0]
+        file_cn = os.path.join(chn_dir, basename + ".chn")
+        cn_data = parse_file(file_cn) if os.path.exists(file_cn) else {}
+        en_data = parse_file(os.path.join(int_dir, name))
+
+        for section, en_kvs in en_data.items():
+            cn_kvs = cn_data.get(section, {})
+            for k, en_val in en_kvs.items():
+                cn_val = cn_kvs.get(k, "")
+                if en_val and not chinese_pattern.search(cn_val):
+                    entries.append((basename, section, k, en_val))
+    return entries
+
+
+def load_mapping(paths):
+    """读取 combine.py 生成的 'en -> cn' 映射文件，键为规范化后的英文"""
+    mapping = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                en_val, sep, cn_val = line.rstrip("\n").partition(" -> ")
+                if sep and cn_val:
+                    mapping[normalize(en_val)] = cn_val
+    return mapping
+
+
+class ResultCache:
+    """持久化的翻译结果缓存，键为规范化后的原文"""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def get(self, text):
+        return self.data.get(normalize(text))
+
+    def put(self, text, translation):
+        self.data[normalize(text)] = translation
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class HttpPool:
+    """
+    基于 asyncio 的 HTTP/1.1 keep-alive 连接池
+
+    同一时间最多 size 个请求在途，空闲连接留给后续批次复用。
+    """
+
+    def __init__(self, url, size=4, timeout=60):
+        # timeout 同时限制建立连接和完成一次请求的总耗时
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise MtError(f"不支持的地址: {url}")
+        self.ssl = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.timeout = timeout
+        self._idle = []
+        self._sem = asyncio.Semaphore(max(1, size))
+        self.connects = 0
+        self.requests = 0
+
+    async def _connect(self):
+        conn = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        self.connects += 1
+        return conn
+
+    async def _request(self, conn, body):
+        reader, writer = conn
+        head = (
+            f"POST {self.path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        writer.write(head.encode("ascii") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("连接已被服务端关闭")
+        try:
+            version, code = status_line.split()[:2]
+            if not version.startswith(b"HTTP/"):
+                raise ValueError(version)
+            status = int(code)
+        except ValueError:
+            raise MtError(f"无效的状态行: {status_line[:100]!r}")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked(reader)
+        elif headers.get("content-length", "").isdigit():
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            raise MtError("响应既没有有效的 Content-Length，也不是 chunked 编码")
+        keep_alive = headers.get("connection", "").lower() != "close"
+        return status, data, keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            try:
+                size = int(size_line.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise MtError(f"无效的 chunk 长度: {size_line[:100]!r}")
+            if size == 0:
+                # 跳过 trailer，直到空行
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+
+    async def post_json(self, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        async with self._sem:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                try:
+                    conn = await asyncio.wait_for(self._connect(), self.timeout)
+                except (OSError, asyncio.TimeoutError) as e:
+                    raise ConnectError(f"无法连接 {self.host}:{self.port}: {e!r}") from e
+            try:
+                remaining = max(0.0, deadline - loop.time())
+                status, data, keep_alive = await asyncio.wait_for(self._request(conn, body), remaining)
+            except BaseException:
+                conn[1].close()
+                raise
+            self.requests += 1
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn[1].close()
+
+        if status != 200:
+            raise MtError(f"HTTP {status}: {data[:200]!r}", retryable=status == 429 or status >= 500)
+        return json.loads(data.decode("utf-8"))
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+class HttpBackend:
+    """默认翻译后端：按上面的 JSON 协议调用 HTTP 接口"""
+
+    def __init__(self, url=DEFAULT_URL, concurrency=4, source="en", target="zh"):
+        self.pool = HttpPool(url, size=concurrency)
+        self.source = source
+        self.target = target
+
+    async def translate(self, texts):
+        result = await self.pool.post_json({"source": self.source, "target": self.target, "texts": texts})
+        if not isinstance(result, dict):
+            raise MtError(f"响应不是 JSON 对象: {type(result).__name__}")
+        translations = result.get("translations")
+        if not isinstance(translations, list) or len(translations) != len(texts):
+            raise MtError("响应中的 translations 数量与请求不一致")
+        if not all(isinstance(t, str) for t in translations):
+            raise MtError("响应中的 translations 必须全部是字符串")
+        return translations
+
+    async def close(self):
+        await self.pool.close()
+
+
+def make_batches(texts, max_items=50, max_chars=4000):
+    """按条数和总字符数切分批次；超长的单条文本单独成批"""
+    batches = []
+    batch, size = [], 0
+    for text in texts:
+        if batch and (len(batch) >= max_items or size + len(text) > max_chars):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def translate_batches(backend, batches, concurrency=4, retries=4, backoff=0.5, on_result=None,
+                            max_connect_failures=3):
+    """
+    用 concurrency 个 worker 消费批次队列，失败的批次按指数退避重试
+
+    连续 max_connect_failures 次无法建立连接时认为接口不可用，放弃剩余批次。
+
+    Returns:
+        dict: {'translated': {原文: 译文}, 'failed': [(批次, 错误), ...], 'aborted': bool}
+    """
+    queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait(batch)
+    results = {'translated': {}, 'failed': [], 'aborted': False}
+    connect_failures = 0
+    abort = asyncio.Event()
+    abort_error = MtError(f"连续 {max_connect_failures} 次无法连接翻译接口，已放弃")
+
+    async def worker():
+        nonlocal connect_failures
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            translations = None
+            for attempt in range(retries + 1):
+                if abort.is_set():
+                    results['failed'].append((batch, abort_error))
+                    break
+                try:
+                    translations = await backend.translate(batch)
+                    connect_failures = 0
+                    break
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, MtError, ValueError) as e:
+                    if isinstance(e, ConnectError):
+                        connect_failures += 1
+                        if connect_failures >= max_connect_failures:
+                            abort.set()
+                    # 连接/超时类错误可以重试；响应格式错误（ValueError）重试也没用
+                    retryable = e.retryable if isinstance(e, MtError) else not isinstance(e, ValueError)
+                    if not retryable or attempt == retries or abort.is_set():
+                        results['failed'].append((batch, e))
+                        break
+                    # 退避期间若其他 worker 已判定接口不可用，立即结束等待
+                    try:
+                        await asyncio.wait_for(abort.wait(), backoff * 2 ** attempt)
+                    except asyncio.TimeoutError:
+                        pass
+            if translations is not None:
+                for text, translation in zip(batch, translations):
+                    results['translated'][text] = translation
+                    if on_result:
+                        on_result(text, translation)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(batches))))))
+    results['aborted'] = abort.is_set()
+    return results
+
+
+async def draft_async(entries, mapping, cache, backend, concurrency=4, max_items=50, max_chars=4000,
+                      retries=4, backoff=0.5):
+    """
+    为未翻译条目生成草稿
+
+    Returns:
+        dict: {'drafts': {原文: 译文}, 'from_mapping': n, 'from_cache': n,
+               'requested': n, 'batches': n, 'failed': [(批次, 错误), ...], 'aborted': bool}
+    """
+    drafts = {}
+    pending = {}
+    from_mapping = from_cache = 0
+    for _, _, _, en_val in entries:
+        key = normalize(en_val)
+        if en_val in drafts or key in pending:
+            continue
+        if key in mapping:
+            drafts[en_val] = mapping[key]
+            from_mapping += 1
+        elif cache.get(en_val) is not None:
+            drafts[en_val] = cache.get(en_val)
+            from_cache += 1
+        else:
+            pending[key] = en_val
+
+    batches = make_batches(list(pending.values()), max_items, max_chars)
+    try:
+        results = await translate_batches(backend, batches, concurrency, retries, backoff, on_result=cache.put)
+    finally:
+        cache.save()
+    drafts.update(results['translated'])
+
+    # 规范化后相同的其他写法也使用同一份译文
+    for _, _, _, en_val in entries:
+        if en_val not in drafts and cache.get(en_val) is not None:
+            drafts[en_val] = cache.get(en_val)
+
+    return {
+        'drafts': drafts,
+        'from_mapping': from_mapping,
+        'from_cache': from_cache,
+        'requested': len(pending),
+        'batches': len(batches),
+        'failed': results['failed'],
+        'aborted': results['aborted'],
+    }
+
+
+def draft_translations(chn_dir="CHN", int_dir="INT", out_dir="MERGED", url=DEFAULT_URL,
+                       mapping_paths=None, cache_path=None, concurrency=4, max_items=50, max_chars=4000,
+                       retries=4, backoff=0.5):
+    """收集未翻译文本、请求草稿并写出 out_dir/drafts.txt"""
+    if mapping_paths is None:
+        mapping_paths = sorted(glob.glob(os.path.join(out_dir, "mapping*.txt")))
+    if cache_path is None:
+        cache_path = os.path.join(out_dir, "mt_cache.json")
+
+    entries = collect_untranslated(chn_dir, int_dir)
+    mapping = load_mapping(mapping_paths)
+    cache = ResultCache(cache_path)
+    print(f"未翻译条目: {len(entries)} 个, 已有映射: {len(mapping)} 条, 缓存: {len(cache.data)} 条")
+
+    async def run():
+        backend = HttpBackend(url, concurrency)
+        try:
+            results = await draft_async(entries, mapping, cache, backend, concurrency, max_items, max_chars,
+                                        retries, backoff)
+        finally:
+            await backend.close()
+        results['connects'] = backend.pool.connects
+        results['requests'] = backend.pool.requests
+        return results
+
+    results = asyncio.run(run())
+
+    os.makedirs(out_dir, exist_ok=True)
+    drafts_path = os.path.join(out_dir, "drafts.txt")
+    with open(drafts_path, "w", encoding="utf-8") as f:
+        for en_val, cn_val in sorted(results['drafts'].items()):
+            f.write(f"{en_val} -> {cn_val}\n")
+    results['drafts_path'] = drafts_path
+    return results
+
+
+def print_draft_summary(results):
+    print(f"\n📊 草稿统计:")
+    print(f"  来自已有映射: {results['from_mapping']} 条")
+    print(f"  来自缓存: {results['from_cache']} 条")
+    print(f"  请求翻译: {results['requested']} 条, 共 {results['batches']} 批")
+    print(f"  HTTP 请求: {results.get('requests', 0)} 次, 新建连接: {results.get('connects', 0)} 个")
+    print(f"  失败批次: {len(results['failed'])} 个")
+    if results.get('aborted'):
+        print("  ⚠️  翻译接口无法连接，剩余批次已放弃")
+    # 同一原因导致的失败合并显示
+    errors = {}
+    for batch, error in results['failed']:
+        counts = errors.setdefault(str(error), [0, 0])
+        counts[0] += 1
+        counts[1] += len(batch)
+    for error, (batches, texts) in errors.items():
+        print(f"  - {batches} 批 / {texts} 条: {error}")
+    print(f"草稿已保存到 {results['drafts_path']}")
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URL
+    print_draft_summary(draft_translations(url=url))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+mt_draft.py 使用的本地替身翻译服务
+
+按 mt_draft.py 的 JSON 协议应答，译文为 "[草稿] " + 原文，用于在没有真实翻译接口时
+联调批处理、重试和缓存。支持 keep-alive，并统计收到的请求数、连接数和原文。
+
+用法:
+    python mt_stub_server.py [端口] [失败率]
+"""
+
+import asyncio
+import json
+import random
+import sys
+
+DEFAULT_PORT = 8089
+
+
+class StubServer:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, fail_rate=0.0, delay=0.0, chunked=False, seed=None):
+        self.host = host
+        self.port = port
+        self.fail_rate = fail_rate   # 以该概率返回 503，用于验证重试
+        self.delay = delay           # 每个请求的模拟延迟（秒）
+        self.chunked = chunked       # 用 Transfer-Encoding: chunked 返回响应
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+        self.received = []           # 成功翻译过的原文
+        self._random = random.Random(seed)
+        self._server = None
+
+    @staticmethod
+    def translate(text):
+        return "[草稿] " + text
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/translate"
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                if self._random.random() < self.fail_rate:
+                    self.failures += 1
+                    status, payload = 503, {"error": "stub failure"}
+                else:
+                    texts = json.loads(body.decode("utf-8"))["texts"]
+                    self.received.extend(texts)
+                    status, payload = 200, {"translations": [self.translate(t) for t in texts]}
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                if self.chunked:
+                    # 分成两块发送，验证客户端的 chunked 解码
+                    half = len(data) // 2
+                    length_header = "Transfer-Encoding: chunked\r\n"
+                    data = b"".join(
+                        b"%x\r\n%s\r\n" % (len(part), part) for part in (data[:half], data[half:]) if part
+                    ) + b"0\r\n\r\n"
+                else:
+                    length_header = f"Content-Length: {len(data)}\r\n"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Service Unavailable'}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"{length_header}"
+                    "Connection: keep-alive\r\n\r\n".encode("ascii") + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(port=DEFAULT_PORT, fail_rate=0.0):
+    server = await StubServer(port=port, fail_rate=fail_rate).start()
+    print(f"替身翻译服务已启动: {server.url}")
+    await server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    fail_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    try:
+        asyncio.run(serve(port, fail_rate))
+    except KeyboardInterrupt:
+        pass
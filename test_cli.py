@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+
+import pytest
+
+import cli
+from cn_tree import CnTree
+
+
+@pytest.fixture
+def cn_dir(tmp_path):
+    loc = tmp_path / 'cn' / '1001' / 'Localization'
+    loc.mkdir(parents=True)
+    (loc / 'XComGame.chn').write_bytes('\ufeff[A X2Template]\r\nName="测试"\r\n'.encode('utf-16-le'))
+    return str(tmp_path / 'cn')
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    calls = []
+    original = CnTree.scan.__func__
+
+    def counting_scan(cls, root='cn'):
+        calls.append(root)
+        return original(cls, root)
+
+    monkeypatch.setattr(CnTree, 'scan', classmethod(counting_scan))
+    return calls
+
+
+def test_chain_shares_one_scan(cn_dir, scans, capsys):
+    assert cli.main(['--cn', cn_dir, 'validate', 'chinese']) == 0
+    assert scans == [cn_dir]
+
+
+def test_invalidate_forces_rescan(cn_dir, scans, capsys):
+    ctx = cli.Context(cli.build_parser().parse_args(['--cn', cn_dir, 'validate']))
+    first = ctx.tree
+    assert ctx.tree is first
+    ctx.invalidate()
+    assert ctx.tree is not first
+    assert len(scans) == 2
+
+    # layout 会改动目录结构，之后的子命令要重新扫描
+    scans.clear()
+    assert cli.main(['--cn', cn_dir, 'validate', 'layout', 'chinese']) == 0
+    assert scans == [cn_dir, cn_dir]
+
+
+def test_validate_does_not_import_charset_normalizer(cn_dir, monkeypatch, capsys):
+    monkeypatch.delitem(sys.modules, 'charset_normalizer', raising=False)
+    monkeypatch.delitem(sys.modules, 'det', raising=False)
+    assert cli.main(['--cn', cn_dir, 'validate']) == 0
+    assert 'charset_normalizer' not in sys.modules
+    assert 'det' not in sys.modules
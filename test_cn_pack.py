@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import zlib
+
+import pytest
+
+from cn_pack import FOOTER, INDEX_VERSION, MAGIC, MAGIC_END, CnPack, CnPackError, guess_encoding, pack, unpack
+from main import deploy
+
+
+def make_tree(root):
+    files = {
+        '1001/Localization/XComGame.chn': '\ufeff[A X2Template]\r\nName="测试"\r\n'.encode('utf-16-le'),
+        '1001/Localization/Other.chn': '[B X2Template]\r\nName="另一个"\r\n'.encode('utf-16-le'),
+        '1002/Localization/XComGame.chn': '[C X2Template]\r\nName="中文"\r\n'.encode('gb18030'),
+        '1003/Localization/readme.txt': b'plain text\r\n',
+    }
+    for rel, data in files.items():
+        path = os.path.join(root, *rel.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    os.makedirs(os.path.join(root, '1004'))  # 空的 mod 目录也要保留
+    return files
+
+
+def read_all(root):
+    result = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                result[os.path.relpath(path, root).replace(os.sep, '/')] = f.read()
+    return result
+
+
+def test_round_trip_is_byte_identical(tmp_path):
+    src = tmp_path / 'cn'
+    files = make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+
+    results = pack(str(src), archive)
+    assert len(results['compressed']) == len(files)
+
+    dst = tmp_path / 'out'
+    assert unpack(archive, str(dst)) == len(files)
+    assert read_all(dst) == files
+    assert os.path.isdir(dst / '1004')
+
+    with CnPack(archive) as archive_tree:
+        entry = archive_tree.entries['1002/Localization/XComGame.chn']
+        assert entry['mod'] == '1002'
+        assert entry['size'] == len(files['1002/Localization/XComGame.chn'])
+        assert entry['encoding'] == 'gb18030'
+        assert archive_tree.read_bytes('1001/Localization/Other.chn') == files['1001/Localization/Other.chn']
+
+
+def test_repack_reuses_unchanged_members(tmp_path):
+    src = tmp_path / 'cn'
+    files = make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+    pack(str(src), archive)
+
+    with open(src / '1001' / 'Localization' / 'Other.chn', 'ab') as f:
+        f.write('X="新"\r\n'.encode('utf-16-le'))
+    results = pack(str(src), archive)
+
+    assert results['compressed'] == ['1001/Localization/Other.chn']
+    assert len(results['reused']) == len(files) - 1
+    assert results['removed'] == []
+
+
+def corrupt_member(archive, rel):
+    with CnPack(archive) as archive_tree:
+        offset = archive_tree.entries[rel]['offset']
+    with open(archive, 'r+b') as f:
+        f.seek(offset + 4)
+        byte = f.read(1)
+        f.seek(offset + 4)
+        f.write(bytes([byte[0] ^ 0xff]))
+
+
+def write_raw_archive(path, paths, mods=()):
+    """手工写出一个归档，用于构造正常打包流程不会产生的索引"""
+    data = zlib.compress(b'x')
+    entries = []
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        for rel in paths:
+            entries.append({'mod': '', 'path': rel, 'sha1': hashlib.sha1(b'x').hexdigest(), 'size': 1,
+                            'encoding': 'utf-8', 'offset': f.tell(), 'csize': len(data), 'crc32': zlib.crc32(data)})
+            f.write(data)
+        index = zlib.compress(json.dumps({'version': INDEX_VERSION, 'mods': list(mods), 'files': entries}).encode())
+        offset = f.tell()
+        f.write(index)
+        f.write(FOOTER.pack(offset, len(index), MAGIC_END))
+
+
+def test_repack_does_not_reuse_corrupt_member(tmp_path):
+    src = tmp_path / 'cn'
+    files = make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+    pack(str(src), archive)
+
+    rel = '1001/Localization/XComGame.chn'
+    corrupt_member(archive, rel)
+
+    results = pack(str(src), archive)
+    assert results['compressed'] == [rel]
+    with CnPack(archive) as archive_tree:
+        assert archive_tree.read_bytes(rel) == files[rel]
+
+
+def test_read_bytes_detects_sha1_mismatch(tmp_path):
+    src = tmp_path / 'cn'
+    make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+    pack(str(src), archive)
+
+    with CnPack(archive) as archive_tree:
+        rel = '1001/Localization/Other.chn'
+        archive_tree.entries[rel]['sha1'] = hashlib.sha1(b'other').hexdigest()
+        with pytest.raises(CnPackError):
+            archive_tree.read_bytes(rel)
+
+
+def test_corrupt_index_falls_back_to_full_repack(tmp_path):
+    src = tmp_path / 'cn'
+    files = make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+    pack(str(src), archive)
+
+    with CnPack(archive) as archive_tree:
+        index_start = max(e['offset'] + e['csize'] for e in archive_tree.entries.values())
+    size = os.path.getsize(archive)
+    with open(archive, 'r+b') as f:
+        f.seek(index_start)
+        f.write(b'\x00' * (size - 16 - index_start))
+
+    with pytest.raises(CnPackError):
+        CnPack(archive)
+    results = pack(str(src), archive)
+    assert len(results['compressed']) == len(files)
+
+
+def test_guess_encoding():
+    text = '你好世界，这是测试'
+    assert guess_encoding(b'\xff\xfe' + text.encode('utf-16-le')) == 'utf-16-le-bom'
+    assert guess_encoding(text.encode('utf-16-le')) == 'utf-16-le'
+    assert guess_encoding('[A]\r\nName="测试"'.encode('utf-16-le')) == 'utf-16-le'
+    assert guess_encoding(text.encode('utf-8')) == 'utf-8'
+    assert guess_encoding(text.encode('gb18030')) == 'gb18030'
+
+
+def test_corrupt_member_raises_and_leaves_no_file(tmp_path):
+    src = tmp_path / 'cn'
+    files = make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+    pack(str(src), archive)
+    bad = '1001/Localization/XComGame.chn'
+    corrupt_member(archive, bad)
+
+    with CnPack(archive) as archive_tree:
+        with pytest.raises(CnPackError):
+            archive_tree.read_bytes(bad)
+        dst = str(tmp_path / 'out.chn')
+        with pytest.raises(CnPackError):
+            archive_tree.copy_to(bad, dst)
+        assert not os.path.exists(dst)
+        assert not os.path.exists(dst + '.tmp')
+
+    # deploy 跳过损坏的成员，其他文件照常部署
+    workshop = tmp_path / 'ws'
+    for mod_id in ('1001', '1002'):
+        (workshop / mod_id / 'Localization').mkdir(parents=True)
+    with CnPack(archive) as archive_tree:
+        results = deploy(str(workshop), tree=archive_tree)
+    assert [rel for rel, _ in results['skipped']] == [bad]
+    assert not (workshop / '1001' / 'Localization' / 'XComGame.chn').exists()
+    assert (workshop / '1001' / 'Localization' / 'Other.chn').read_bytes() == files['1001/Localization/Other.chn']
+    assert len(results['replaced']) == 2
+
+
+def test_pack_refuses_missing_or_empty_root(tmp_path):
+    src = tmp_path / 'cn'
+    make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+    pack(str(src), archive)
+    size = os.path.getsize(archive)
+
+    with pytest.raises(CnPackError):
+        pack(str(tmp_path / 'missing'), archive)
+    (tmp_path / 'empty').mkdir()
+    with pytest.raises(CnPackError):
+        pack(str(tmp_path / 'empty'), archive)
+
+    assert os.path.getsize(archive) == size
+    assert not os.path.exists(archive + '.tmp')
+
+
+def test_pack_removes_tmp_on_failure(tmp_path, monkeypatch):
+    src = tmp_path / 'cn'
+    make_tree(src)
+    archive = str(tmp_path / 'cn.cnpk')
+
+    def fail(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr('cn_pack.guess_encoding', fail)
+    with pytest.raises(OSError):
+        pack(str(src), archive)
+    assert not os.path.exists(archive)
+    assert not os.path.exists(archive + '.tmp')
+
+
+@pytest.mark.parametrize('rel', ['../../escaped.txt', '/etc/escaped.txt', '1001/../../escaped.txt',
+                                 'C:/escaped.txt', '1001\\..\\..\\escaped.txt'])
+def test_unsafe_member_paths_are_rejected(tmp_path, rel):
+    archive = str(tmp_path / 'evil.cnpk')
+    write_raw_archive(archive, [rel])
+    with pytest.raises(CnPackError):
+        CnPack(archive)
+    with pytest.raises(CnPackError):
+        unpack(archive, str(tmp_path / 'out' / 'cn'))
+    assert not (tmp_path / 'escaped.txt').exists()
+    assert not (tmp_path / 'out' / 'escaped.txt').exists()
+
+
+def test_unsafe_mod_id_is_rejected(tmp_path):
+    archive = str(tmp_path / 'evil.cnpk')
+    write_raw_archive(archive, ['1001/Localization/a.chn'], mods=['..'])
+    with pytest.raises(CnPackError):
+        CnPack(archive)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import cli
+from mt_draft import (
+    HttpBackend, MtError, collect_untranslated, draft_translations, make_batches, translate_batches,
+)
+from mt_stub_server import StubServer
+
+MAPPED = "Mapped text already translated elsewhere."
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    int_lines, chn_lines = [], []
+    for i in range(30):
+        int_lines += [f"[Item{i} X2Template]", f'Name="Untranslated name number {i}"',
+                      f'Desc="Shared   description."']
+        chn_lines += [f"[Item{i} X2Template]"]
+        if i % 3 == 0:
+            chn_lines.append('Name="已翻译"')
+    int_lines += ["[Mapped X2Template]", f'Name="{MAPPED}"']
+
+    for name, lines in (("INT/XComGame.int", int_lines), ("CHN/XComGame.chn", chn_lines)):
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        # 与游戏文件一致：UTF-16 LE，CRLF；首行留空，避开 parse_file 对 BOM 的处理
+        path.write_text("\r\n" + "\r\n".join(lines) + "\r\n", encoding="utf-16-le", newline="")
+
+    out_dir = tmp_path / "MERGED"
+    out_dir.mkdir()
+    (out_dir / "mapping_test.txt").write_text(f"{MAPPED} -> 已有译文\n", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def stub():
+    """在单独线程的事件循环中运行替身服务，draft_translations 自己会调用 asyncio.run"""
+    servers = []
+
+    def start(**kwargs):
+        loop = asyncio.new_event_loop()
+        server = StubServer(port=0, **kwargs)
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(server.start())
+            ready.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        ready.wait(5)
+        servers.append((loop, server, thread))
+        return server
+
+    yield start
+    for loop, server, thread in servers:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+
+def run_draft(root, url, **kwargs):
+    kwargs.setdefault("max_items", 4)
+    kwargs.setdefault("backoff", 0.01)
+    return draft_translations(
+        str(root / "CHN"), str(root / "INT"), str(root / "MERGED"), url=url, concurrency=3, **kwargs
+    )
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_make_batches_limits_items_and_chars():
+    assert [len(b) for b in make_batches(["a"] * 10, max_items=4)] == [4, 4, 2]
+    assert [len(b) for b in make_batches(["x" * 30, "y" * 30, "z" * 100], max_chars=64)] == [2, 1]
+
+
+def test_draft_against_stub(fixtures, stub):
+    server = stub(fail_rate=0.3, seed=1)
+    entries = collect_untranslated(str(fixtures / "CHN"), str(fixtures / "INT"))
+    results = run_draft(fixtures, server.url)
+
+    # 20 个未翻译的 Name + 1 条共享的 Desc（规范化后去重），映射中已有的那条不发送
+    assert results['requested'] == 21
+    assert results['batches'] == len(make_batches(["t"] * 21, max_items=4)) == 6
+    assert server.failures > 0
+    assert results['failed'] == []
+    assert results['requests'] == results['batches'] + server.failures
+    assert MAPPED not in server.received
+    assert results['from_mapping'] == 1
+    assert len(server.received) == 21
+    assert len(results['drafts']) == len({e[3] for e in entries})
+    assert results['drafts'][MAPPED] == "已有译文"
+    assert results['drafts']["Untranslated name number 1"] == "[草稿] Untranslated name number 1"
+
+    # 第二次运行全部来自缓存
+    again = run_draft(fixtures, server.url)
+    assert again['requests'] == 0
+    assert again['from_cache'] == 21
+    assert again['drafts'] == results['drafts']
+    assert os.path.exists(fixtures / "MERGED" / "drafts.txt")
+
+
+def test_chunked_response(fixtures, stub):
+    server = stub(chunked=True)
+    results = run_draft(fixtures, server.url)
+    assert results['failed'] == []
+    assert len(server.received) == 21
+
+
+def test_unreachable_endpoint_fails_fast(fixtures):
+    started = time.monotonic()
+    results = run_draft(fixtures, f"http://127.0.0.1:{closed_port()}/translate", max_items=1, backoff=1)
+    assert time.monotonic() - started < 2
+    assert results['aborted']
+    assert len(results['failed']) == results['batches'] == 21
+    assert results['requests'] == 0
+
+
+def run_against(response, batches, concurrency=2):
+    """用只会返回固定内容的服务端跑一遍 translate_batches"""
+    async def run():
+        async def handle(reader, writer):
+            await reader.read(65536)
+            writer.write(response)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/translate"
+        backend = HttpBackend(url, concurrency)
+        try:
+            return await asyncio.wait_for(
+                translate_batches(backend, batches, concurrency=concurrency, backoff=0.01), 5)
+        finally:
+            await backend.close()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(run())
+
+
+def json_response(body):
+    return b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)
+
+
+def test_malformed_status_line_does_not_crash():
+    results = run_against(b"garbage\r\n", [["a"], ["b"]])
+    assert len(results['failed']) == 2
+    assert all(isinstance(error, MtError) for _, error in results['failed'])
+
+
+@pytest.mark.parametrize("body", [b'["x"]', b'{"translations": [null]}', b'{"translations": [1]}', b'null'])
+def test_invalid_response_body_fails_batch(body):
+    results = run_against(json_response(body), [["a"]])
+    assert results['translated'] == {}
+    assert len(results['failed']) == 1
+    error = results['failed'][0][1]
+    assert isinstance(error, MtError) and not error.retryable
+
+
+def test_zero_concurrency_does_not_hang():
+    results = run_against(json_response(b'{"translations": ["x"]}'), [["a"]], concurrency=0)
+    assert results['translated'] == {"a": "x"}
+
+
+def test_cli_draft_exit_codes(fixtures, capsys):
+    common = ['--chn-dir', str(fixtures / "CHN"), '--out-dir', str(fixtures / "MERGED")]
+    url = f"http://127.0.0.1:{closed_port()}/translate"
+    assert cli.main(common + ['--int-dir', str(fixtures / "INT"), '--mt-url', url, 'draft', 'merge']) == 1
+    # 失败后不再执行链上的 merge
+    assert not (fixtures / "MERGED" / "mapping.txt").exists()
+
+    assert cli.main(common + ['--int-dir', str(fixtures / "missing"), 'draft']) == 1
+    assert "不存在" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        cli.main(common + ['--mt-concurrency', '0', 'draft'])